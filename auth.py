@@ -1,47 +1,141 @@
 # auth.py
+import base64
+import concurrent.futures
+import hashlib
+import hmac
+import os
+import threading
+import time
+
 import bcrypt
-from jose import jwt, JWTError
-from datetime import datetime, timedelta, timezone
+import orjson
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHash, VerifyMismatchError
+from cachetools import TTLCache
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from bson import ObjectId
+from bson.errors import InvalidId
 
-from config import SECRET_KEY, ALGORITHM, TOKEN_EXPIRE_MIN
+from config import SECRET_KEY, ALGORITHM, TOKEN_EXPIRE_MIN, PEPPER
 from database import admins
 
 security = HTTPBearer()
 
+# short-lived cache so repeat requests with the same token skip
+# jwt decode + the mongo admin lookup
+TOKEN_CACHE_TTL = 30
+_token_cache = TTLCache(maxsize=10000, ttl=TOKEN_CACHE_TTL)
+_token_cache_lock = threading.Lock()
+
+
+# password hashing - argon2id, tuned so login stays fast while staying
+# expensive for GPU crackers. old bcrypt hashes still verify and get
+# rehashed on next login (see needs_rehash)
+ph = PasswordHasher(time_cost=2, memory_cost=64 * 1024, parallelism=1)
+
+# bounded pool for the CPU-heavy hash work so it never starves the
+# request threadpool; sized to physical cores
+HASH_POOL = concurrent.futures.ProcessPoolExecutor(max_workers=os.cpu_count())
+
+# verified against when the login email doesn't exist, so both branches
+# pay the same hash cost and response time can't enumerate users
+DUMMY_HASH = ph.hash("invalid")
+
+
+_PEPPER_BYTES = PEPPER.encode('utf-8')
+
+
+def _prehash(password: str) -> str:
+    """mix the server pepper into the password via hmac-sha256.
+
+    a leaked database alone isn't crackable without the pepper, at no
+    extra per-login cost. no-op when PEPPER is unset.
+    """
+    if not _PEPPER_BYTES:
+        return password
+    mac = hmac.new(_PEPPER_BYTES, password.encode('utf-8'), hashlib.sha256)
+    return base64.b64encode(mac.digest()).decode()
+
 
-# password hashing
 def hash_pwd(password: str) -> str:
-    pwd_bytes = password.encode('utf-8')
-    salt = bcrypt.gensalt()
-    hashed = bcrypt.hashpw(pwd_bytes, salt)
-    return hashed.decode('utf-8')
+    return ph.hash(_prehash(password))
 
 
 def check_pwd(plain_pwd: str, hashed_pwd: str) -> bool:
-    return bcrypt.checkpw(
-        plain_pwd.encode('utf-8'),
-        hashed_pwd.encode('utf-8')
-    )
+    # legacy bcrypt hashes start with $2; they predate the pepper so
+    # verify the raw password (rehash on login migrates them)
+    if hashed_pwd.startswith("$2"):
+        return bcrypt.checkpw(
+            plain_pwd.encode('utf-8'),
+            hashed_pwd.encode('utf-8')
+        )
+
+    try:
+        return ph.verify(hashed_pwd, _prehash(plain_pwd))
+    except (VerifyMismatchError, InvalidHash):
+        return False
+
+
+def needs_rehash(hashed_pwd: str) -> bool:
+    """true if the stored hash is bcrypt or uses outdated argon2 params"""
+    if hashed_pwd.startswith("$2"):
+        return True
+    try:
+        return ph.check_needs_rehash(hashed_pwd)
+    except InvalidHash:
+        return False
+
+
+# jwt token stuff - HS256 signed directly with a prepared hmac context.
+# jose rebuilt the hmac state (ipad/opad) from the raw key on every
+# encode/decode; copying a ready template skips that
+_KEY_BYTES = SECRET_KEY.encode('utf-8')
+_HMAC_TEMPLATE = hmac.new(_KEY_BYTES, digestmod=hashlib.sha256)
+
+
+def _b64url(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+def _b64url_decode(data: bytes) -> bytes:
+    return base64.urlsafe_b64decode(data + b"=" * (-len(data) % 4))
+
+
+def _sign(signing_input: bytes) -> bytes:
+    ctx = _HMAC_TEMPLATE.copy()
+    ctx.update(signing_input)
+    return ctx.digest()
+
+
+# header never changes for a fixed HS256 issuer, so encode it once
+# (dot included - one concat fewer per token)
+_HEADER_PREFIX = _b64url(orjson.dumps({"alg": ALGORITHM, "typ": "JWT"})) + b"."
+_TOKEN_TTL_SECS = TOKEN_EXPIRE_MIN * 60
 
 
-# jwt token stuff
 def create_token(data: dict):
     payload = data.copy()
-    expire = datetime.now(timezone.utc) + timedelta(minutes=TOKEN_EXPIRE_MIN)
-    payload["exp"] = expire
+    # plain integer clock math, no datetime/timedelta objects
+    payload["exp"] = int(time.time()) + _TOKEN_TTL_SECS
 
-    token = jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
-    return token
+    body = _HEADER_PREFIX + _b64url(orjson.dumps(payload))
+    sig = _b64url(_sign(body))
+    return (body + b"." + sig).decode()
 
 
 def verify_token(token: str):
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        body, _, sig = token.encode().rpartition(b".")
+        expected = _b64url(_sign(body))
+        if not (body and hmac.compare_digest(sig, expected)):
+            raise ValueError("bad signature")
+
+        payload = orjson.loads(_b64url_decode(body.split(b".")[1]))
+        if payload.get("exp", 0) < time.time():
+            raise ValueError("expired")
         return payload
-    except JWTError:
+    except (ValueError, KeyError, IndexError):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Token validation failed"
@@ -49,8 +143,20 @@ def verify_token(token: str):
 
 
 # dependency for protected routes
-def get_current_user(creds: HTTPAuthorizationCredentials = Depends(security)):
+async def get_current_user(creds: HTTPAuthorizationCredentials = Depends(security)):
     token = creds.credentials
+
+    # cache hit -> skip decode and db lookup entirely
+    cache_key = hashlib.sha256(token.encode()).hexdigest()[:32]
+    with _token_cache_lock:
+        cached = _token_cache.get(cache_key)
+    if cached:
+        expires_at, user = cached
+        if time.time() < expires_at:
+            return user
+        with _token_cache_lock:
+            _token_cache.pop(cache_key, None)
+
     payload = verify_token(token)
 
     admin_id = payload.get("admin_id")
@@ -62,23 +168,46 @@ def get_current_user(creds: HTTPAuthorizationCredentials = Depends(security)):
             detail="Invalid token"
         )
 
-    # check if admin exists
+    # rebuild the ObjectId from the raw bytes carried in the token -
+    # ObjectId(bytes) skips the hex validation the string form pays.
+    # older tokens only have the hex admin_id
     try:
-        admin = admins.find_one({"_id": ObjectId(admin_id)})
-    except:
+        oid_b64 = payload.get("admin_oid_b64")
+        if oid_b64:
+            admin_oid = ObjectId(base64.b64decode(oid_b64))
+        else:
+            admin_oid = ObjectId(admin_id)
+    except (InvalidId, ValueError, TypeError):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid admin ID"
         )
 
+    # check if admin exists - project only what we return, keeps the
+    # password hash off the wire
+    admin = await admins.find_one(
+        {"_id": admin_oid},
+        {"_id": 1, "email": 1}
+    )
+
     if not admin:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Admin not found"
         )
 
-    return {
+    user = {
         "admin_id": str(admin["_id"]),
         "organization_id": org_id,
         "email": admin.get("email")
-    }
\ No newline at end of file
+    }
+
+    # cache it, but never past the token's own expiry
+    expires_at = time.time() + TOKEN_CACHE_TTL
+    exp = payload.get("exp")
+    if exp:
+        expires_at = min(expires_at, float(exp))
+    with _token_cache_lock:
+        _token_cache[cache_key] = (expires_at, user)
+
+    return user
\ No newline at end of file
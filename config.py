@@ -3,6 +3,10 @@ import os
 
 # JWT stuff
 SECRET_KEY = os.getenv("SECRET_KEY", "dev-secret-key-change-this")
+
+# optional server-side pepper mixed into passwords before hashing.
+# set once before the first deploy; empty disables peppering
+PEPPER = os.getenv("PEPPER", "")
 ALGORITHM = "HS256"
 TOKEN_EXPIRE_MIN = 30
 
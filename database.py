@@ -1,20 +1,35 @@
 # database.py
-from pymongo import MongoClient, ASCENDING
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING
 from config import MONGO_URI, DB_NAME, ORG_COLLECTION, ADMIN_COLLECTION
 
-# setup mongo client
-client = MongoClient(MONGO_URI)
+# setup mongo client - async driver so routes await IO instead of
+# blocking threadpool workers. warm min pool so logins skip tcp/tls
+# setup, zstd compression to shrink bson on the wire
+client = AsyncIOMotorClient(
+    MONGO_URI,
+    maxPoolSize=200,
+    minPoolSize=20,
+    compressors="zstd",
+    retryWrites=True,
+    serverSelectionTimeoutMS=2000,
+    socketTimeoutMS=5000
+)
 db = client[DB_NAME]
 
 # get collections
 orgs = db[ORG_COLLECTION]
 admins = db[ADMIN_COLLECTION]
 
-def init_db():
+async def init_db():
     """setup indexes when app starts"""
     try:
-        orgs.create_index([("organization_name", ASCENDING)], unique=True)
-        admins.create_index([("email", ASCENDING)], unique=True)
+        await orgs.create_index([("organization_name", ASCENDING)], unique=True)
+        await admins.create_index([("email", ASCENDING)], unique=True)
+        # login looks orgs up by admin_id - without this it's a
+        # collection scan. the unique organization_name index above
+        # already serves the get-org lookup
+        await orgs.create_index([("admin_id", ASCENDING)])
         print("DB indexes created")
     except Exception as e:
         print(f"Index creation issue: {e}")
@@ -1,17 +1,21 @@
 # main.py
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from database import init_db
 from routes import router
 
 app = FastAPI(
     title="Organization Management API",
-    version="1.0.0"
+    version="1.0.0",
+    # orjson serializes responses (incl. datetimes) way faster than
+    # stdlib json
+    default_response_class=ORJSONResponse
 )
 
 # setup db on startup
 @app.on_event("startup")
-def startup():
-    init_db()
+async def startup():
+    await init_db()
 
 @app.get("/")
 def root():
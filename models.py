@@ -20,6 +20,11 @@ class LoginRequest(BaseModel):
     email: EmailStr
     password: str
 
+class EnvelopeResponse(BaseModel):
+    success: bool = True
+    message: Optional[str] = None
+    data: dict
+
 class Token(BaseModel):
     access_token: str
     token_type: str = "bearer"
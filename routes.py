@@ -1,20 +1,33 @@
 # routes.py
+import asyncio
+import base64
+
 from fastapi import APIRouter, Depends, HTTPException, status
 from datetime import timedelta
 
-from models import OrgCreate, OrgUpdate, OrgDelete, LoginRequest, Token
+from models import (
+    OrgCreate, OrgUpdate, OrgDelete, LoginRequest, Token, EnvelopeResponse
+)
 from services import create_org, get_org, update_org, delete_org
-from auth import get_current_user, check_pwd, create_token
+from auth import (
+    DUMMY_HASH, HASH_POOL, get_current_user, check_pwd, create_token,
+    hash_pwd, needs_rehash
+)
 from database import admins, orgs
 from config import TOKEN_EXPIRE_MIN
 
 router = APIRouter()
 
 
-@router.post("/org/create", status_code=status.HTTP_201_CREATED)
-def create_organization_endpoint(req: OrgCreate):
+@router.post(
+    "/org/create",
+    status_code=status.HTTP_201_CREATED,
+    response_model=EnvelopeResponse,
+    response_model_exclude_none=True
+)
+async def create_organization_endpoint(req: OrgCreate):
     """create new org"""
-    result = create_org(req.organization_name, req.email, req.password)
+    result = await create_org(req.organization_name, req.email, req.password)
     return {
         "success": True,
         "message": "Org created",
@@ -22,20 +35,28 @@ def create_organization_endpoint(req: OrgCreate):
     }
 
 
-@router.get("/org/get")
-def get_organization_endpoint(organization_name: str):
+@router.get(
+    "/org/get",
+    response_model=EnvelopeResponse,
+    response_model_exclude_none=True
+)
+async def get_organization_endpoint(organization_name: str):
     """get org info"""
-    result = get_org(organization_name)
+    result = await get_org(organization_name)
     return {
         "success": True,
         "data": result
     }
 
 
-@router.put("/org/update")
-def update_organization_endpoint(req: OrgUpdate):
+@router.put(
+    "/org/update",
+    response_model=EnvelopeResponse,
+    response_model_exclude_none=True
+)
+async def update_organization_endpoint(req: OrgUpdate):
     """update org"""
-    result = update_org(
+    result = await update_org(
         req.organization_name,
         req.new_organization_name,
         req.email,
@@ -47,13 +68,17 @@ def update_organization_endpoint(req: OrgUpdate):
     }
 
 
-@router.delete("/org/delete")
-def delete_organization_endpoint(
+@router.delete(
+    "/org/delete",
+    response_model=EnvelopeResponse,
+    response_model_exclude_none=True
+)
+async def delete_organization_endpoint(
         req: OrgDelete,
         user: dict = Depends(get_current_user)
 ):
     """delete org - needs auth"""
-    result = delete_org(req.organization_name, user)
+    result = await delete_org(req.organization_name, user)
     return {
         "success": True,
         "data": result
@@ -61,22 +86,44 @@ def delete_organization_endpoint(
 
 
 @router.post("/admin/login", response_model=Token)
-def login_endpoint(req: LoginRequest):
+async def login_endpoint(req: LoginRequest):
     """admin login"""
-    admin = admins.find_one({"email": req.email})
+    admin = await admins.find_one(
+        {"email": req.email},
+        {"_id": 1, "email": 1, "password": 1}
+    )
+    loop = asyncio.get_running_loop()
     if not admin:
+        # burn the same hash cost as the found-admin branch so timing
+        # doesn't reveal whether the email exists
+        await loop.run_in_executor(HASH_POOL, check_pwd, req.password, DUMMY_HASH)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials"
         )
 
-    if not check_pwd(req.password, admin["password"]):
+    # run the hash check in the process pool so it doesn't block the loop
+    ok = await loop.run_in_executor(
+        HASH_POOL, check_pwd, req.password, admin["password"]
+    )
+    if not ok:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials"
         )
 
-    org = orgs.find_one({"admin_id": str(admin["_id"])})
+    # transparently migrate old bcrypt hashes to argon2id
+    if needs_rehash(admin["password"]):
+        new_hash = await loop.run_in_executor(HASH_POOL, hash_pwd, req.password)
+        await admins.update_one(
+            {"_id": admin["_id"]},
+            {"$set": {"password": new_hash}}
+        )
+
+    org = await orgs.find_one(
+        {"admin_id": str(admin["_id"])},
+        {"_id": 1, "organization_name": 1}
+    )
     if not org:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -85,6 +132,8 @@ def login_endpoint(req: LoginRequest):
 
     token_data = {
         "admin_id": str(admin["_id"]),
+        # raw objectid bytes so auth can skip hex parsing per request
+        "admin_oid_b64": base64.b64encode(admin["_id"].binary).decode(),
         "organization_id": str(org["_id"]),
         "email": admin["email"]
     }
@@ -1,88 +1,133 @@
 # services.py
-import re
+import asyncio
+import string
+from collections import defaultdict
 from datetime import datetime, timezone
 from bson import ObjectId
 from fastapi import HTTPException, status
+from pymongo.errors import DuplicateKeyError, OperationFailure
 
-from database import orgs, admins, db
-from auth import hash_pwd
+from database import orgs, admins, db, client
+from auth import HASH_POOL, hash_pwd
+
+
+# translate table: keep [a-z0-9_], everything else becomes "_".
+# single C-level pass, no regex engine involved
+_SAFE_CHARS = string.ascii_lowercase + string.digits + "_"
+_NAME_TABLE = defaultdict(lambda: "_", {ord(c): c for c in _SAFE_CHARS})
 
 
 def clean_org_name(name):
     """make org name safe for collection naming"""
-    cleaned = re.sub(r'[^a-zA-Z0-9_]', '_', name.lower())
-    return f"org_{cleaned}"
+    return f"org_{name.lower().translate(_NAME_TABLE)}"
 
 
-def setup_org_collection(coll_name):
+async def setup_org_collection(coll_name, created_at):
     """create new collection for org"""
     try:
-        db.create_collection(coll_name)
+        await db.create_collection(coll_name)
         coll = db[coll_name]
         # add initial doc so collection actually exists
-        coll.insert_one({
+        await coll.insert_one({
             "initialized": True,
-            "created_at": datetime.now(timezone.utc),
+            "created_at": created_at,
             "note": "Org data goes here"
         })
         return True
-    except:
+    except Exception:
         return False
 
 
-def create_org(org_name, email, password):
+async def create_org(org_name, email, password):
     """create new org with admin"""
-    # check duplicates
-    if orgs.find_one({"organization_name": org_name}):
+    # name check stays (we create the backing collection before the org
+    # doc); the email check is left to the unique index on insert
+    if await orgs.find_one({"organization_name": org_name}, {"_id": 1}):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Organization name taken"
         )
 
-    if admins.find_one({"email": email}):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email already registered"
-        )
+    # one clock read per request; also keeps the admin/org timestamps
+    # identical, which matters for audit trails
+    now = datetime.now(timezone.utc)
 
-    # make collection
+    # make collection - remember whether we actually created it, so the
+    # failure cleanup below can't drop a collection that belongs to an
+    # existing org with a name that sanitizes the same way
     coll_name = clean_org_name(org_name)
-    setup_org_collection(coll_name)
+    created = await setup_org_collection(coll_name, now)
 
-    # create admin
+    # pre-generate the admin id so both docs are complete before either
+    # insert. hash in the process pool to keep CPU off the event loop
+    loop = asyncio.get_running_loop()
+    admin_id = ObjectId()
+    org_id = ObjectId()
     admin_data = {
+        "_id": admin_id,
         "email": email,
-        "password": hash_pwd(password),
-        "created_at": datetime.now(timezone.utc)
+        "password": await loop.run_in_executor(HASH_POOL, hash_pwd, password),
+        "created_at": now
     }
-    admin_result = admins.insert_one(admin_data)
-
-    # create org
     org_data = {
+        "_id": org_id,
         "organization_name": org_name,
         "collection_name": coll_name,
-        "admin_id": str(admin_result.inserted_id),
+        "admin_id": str(admin_id),
         "admin_email": email,
-        "created_at": datetime.now(timezone.utc),
+        "created_at": now,
         "connection_details": {
             "database": db.name,
             "collection": coll_name
         }
     }
-    org_result = orgs.insert_one(org_data)
+
+    try:
+        try:
+            # commit both docs together so a failed org insert can't
+            # leave a dangling admin behind
+            async with await client.start_session() as session:
+                async with session.start_transaction():
+                    await admins.insert_one(admin_data, session=session)
+                    await orgs.insert_one(org_data, session=session)
+        except DuplicateKeyError:
+            raise
+        except OperationFailure:
+            # standalone mongo (no replica set) can't do transactions
+            await admins.insert_one(admin_data)
+            await orgs.insert_one(org_data)
+    except DuplicateKeyError as e:
+        await admins.delete_one({"_id": admin_id})
+        if created:
+            await db[coll_name].drop()
+        key_pattern = (e.details or {}).get("keyPattern", {})
+        if "organization_name" in key_pattern:
+            detail = "Organization name taken"
+        else:
+            detail = "Email already registered"
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=detail
+        )
 
     return {
-        "organization_id": str(org_result.inserted_id),
+        "organization_id": str(org_id),
         "organization_name": org_name,
         "collection_name": coll_name,
         "admin_email": email,
-        "created_at": org_data["created_at"].isoformat()
+        "created_at": now
     }
 
 
-def get_org(org_name):
+async def get_org(org_name):
     """fetch org details"""
-    org = orgs.find_one({"organization_name": org_name})
+    org = await orgs.find_one(
+        {"organization_name": org_name},
+        {
+            "organization_name": 1, "collection_name": 1, "admin_email": 1,
+            "created_at": 1, "connection_details": 1
+        }
+    )
     if not org:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -94,14 +139,17 @@ def get_org(org_name):
         "organization_name": org["organization_name"],
         "collection_name": org["collection_name"],
         "admin_email": org["admin_email"],
-        "created_at": org["created_at"].isoformat(),
+        "created_at": org["created_at"],
         "connection_details": org["connection_details"]
     }
 
 
-def update_org(old_name, new_name, email, password):
+async def update_org(old_name, new_name, email, password):
     """update org and admin info"""
-    org = orgs.find_one({"organization_name": old_name})
+    org = await orgs.find_one(
+        {"organization_name": old_name},
+        {"_id": 1, "collection_name": 1, "admin_id": 1}
+    )
     if not org:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -110,7 +158,7 @@ def update_org(old_name, new_name, email, password):
 
     # check new name availability
     if old_name != new_name:
-        if orgs.find_one({"organization_name": new_name}):
+        if await orgs.find_one({"organization_name": new_name}, {"_id": 1}):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="New name already exists"
@@ -119,16 +167,24 @@ def update_org(old_name, new_name, email, password):
     old_coll = org["collection_name"]
     new_coll = clean_org_name(new_name)
 
-    # migrate collection if name changed
-    if old_name != new_name:
-        old_collection = db[old_coll]
-        new_collection = db[new_coll]
-
-        docs = list(old_collection.find())
-        if docs:
-            new_collection.insert_many(docs)
-
-        old_collection.drop()
+    # rename collection if name changed - server-side metadata op, no
+    # documents travel over the wire
+    if old_name != new_name and old_coll != new_coll:
+        try:
+            await client.admin.command(
+                "renameCollection",
+                f"{db.name}.{old_coll}",
+                to=f"{db.name}.{new_coll}",
+                dropTarget=False
+            )
+        except OperationFailure as e:
+            # orgs can legitimately have no backing collection (creation
+            # failures are swallowed above) - nothing to move then
+            if e.code != 26:  # NamespaceNotFound
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail=f"Collection rename failed: {e}"
+                )
     else:
         new_coll = old_coll
 
@@ -138,10 +194,10 @@ def update_org(old_name, new_name, email, password):
 
     if email:
         # check email not used by others
-        existing = admins.find_one({
-            "email": email,
-            "_id": {"$ne": ObjectId(admin_id)}
-        })
+        existing = await admins.find_one(
+            {"email": email, "_id": {"$ne": ObjectId(admin_id)}},
+            {"_id": 1}
+        )
         if existing:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -150,10 +206,13 @@ def update_org(old_name, new_name, email, password):
         admin_updates["email"] = email
 
     if password:
-        admin_updates["password"] = hash_pwd(password)
+        loop = asyncio.get_running_loop()
+        admin_updates["password"] = await loop.run_in_executor(
+            HASH_POOL, hash_pwd, password
+        )
 
     if admin_updates:
-        admins.update_one(
+        await admins.update_one(
             {"_id": ObjectId(admin_id)},
             {"$set": admin_updates}
         )
@@ -167,7 +226,7 @@ def update_org(old_name, new_name, email, password):
     if email:
         org_updates["admin_email"] = email
 
-    orgs.update_one(
+    await orgs.update_one(
         {"_id": org["_id"]},
         {"$set": org_updates}
     )
@@ -179,32 +238,38 @@ def update_org(old_name, new_name, email, password):
     }
 
 
-def delete_org(org_name, current_user):
+async def delete_org(org_name, current_user):
     """delete org and everything related"""
-    org = orgs.find_one({"organization_name": org_name})
+    # ownership check and delete in one atomic round trip - the doc
+    # only comes back if this admin owns it, so there's no window for
+    # a concurrent rename/delete between check and removal
+    org = await orgs.find_one_and_delete(
+        {
+            "organization_name": org_name,
+            "admin_id": current_user["admin_id"]
+        },
+        projection={"collection_name": 1, "admin_id": 1}
+    )
     if not org:
+        # only now spend a lookup to tell "missing" from "not yours"
+        if await orgs.find_one({"organization_name": org_name}, {"_id": 1}):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not authorized"
+            )
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Organization not found"
         )
 
-    # verify ownership
-    if org["admin_id"] != current_user["admin_id"]:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized"
-        )
-
     # cleanup
-    db[org["collection_name"]].drop()
+    await db[org["collection_name"]].drop()
 
     try:
-        admins.delete_one({"_id": ObjectId(org["admin_id"])})
+        await admins.delete_one({"_id": ObjectId(org["admin_id"])})
     except Exception as e:
         print(f"Admin delete error: {e}")
 
-    orgs.delete_one({"_id": org["_id"]})
-
     return {
         "message": "Organization deleted",
         "organization_name": org_name